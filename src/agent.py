@@ -6,10 +6,13 @@ import logging
 import os
 import re
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+import asyncpg
 
 from db import (
     Subagent,
+    acquire_conn,
     get_all_subagents,
     get_api_key,
     get_subagent_by_name,
@@ -18,9 +21,14 @@ from db import (
     update_subagent_auth,
 )
 from poke import send_poke_message
-from routing import SubagentRouter
+from routing import RankedMatch, SubagentRouter
 import claude_agent_sdk as claude_sdk
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger("pokestrator.agent")
 
 TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
@@ -93,6 +101,33 @@ PROVIDER_API_PROFILES: dict[str, dict[str, str]] = {
 }
 
 
+# orjson turns integers wider than 64 bits into floats without raising, so any
+# text with a 19+ digit run (e.g. large ids in tool metadata) goes to the stdlib,
+# which keeps them exact.
+_LONG_INT_RE = re.compile(r"\d{19}")
+
+
+def _loads_json(text: str) -> Any:
+    if orjson is not None and not _LONG_INT_RE.search(text):
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # orjson is strict (no NaN/Infinity); let the stdlib have a go.
+            pass
+    return json.loads(text)
+
+
+EventExtractors = tuple[Callable[[Any], str], Callable[[Any], str | None]]
+
+
+def _no_event_text(event: Any) -> str:
+    return ""
+
+
+def _no_event_result(event: Any) -> str | None:
+    return None
+
+
 class PokestratorOrchestrator:
     def __init__(self):
         self.timeout_seconds = int(os.getenv("POKESTRATOR_AGENT_TIMEOUT", "180"))
@@ -117,6 +152,15 @@ class PokestratorOrchestrator:
             1.0,
             max(0.0, float(os.getenv("POKESTRATOR_ROUTE_LLM_MIN_CONFIDENCE", "0.6"))),
         )
+        self.route_llm_batch_enabled = os.getenv("POKESTRATOR_ROUTE_LLM_BATCH_ENABLED", "0") == "1"
+        self.route_llm_batch_max_size = max(
+            1,
+            int(os.getenv("POKESTRATOR_ROUTE_LLM_BATCH_MAX_SIZE", "8")),
+        )
+        self.route_llm_batch_window_ms = max(
+            0,
+            int(os.getenv("POKESTRATOR_ROUTE_LLM_BATCH_WINDOW_MS", "20")),
+        )
         self.log_agent_events = os.getenv("POKESTRATOR_LOG_AGENT_EVENTS", "1") == "1"
         self.event_text_preview_len = int(
             os.getenv("POKESTRATOR_AGENT_EVENT_TEXT_PREVIEW_LEN", "260")
@@ -131,11 +175,15 @@ class PokestratorOrchestrator:
             route_llm_top_k=self.route_llm_top_k,
             route_llm_timeout_seconds=self.route_llm_timeout_seconds,
             route_llm_min_confidence=self.route_llm_min_confidence,
+            route_llm_batch_enabled=self.route_llm_batch_enabled,
+            route_llm_batch_max_size=self.route_llm_batch_max_size,
+            route_llm_batch_window_ms=self.route_llm_batch_window_ms,
             collect_response_text=self._collect_response_text,
             parse_json_object=self._parse_json_object,
             normalize_text_field=self._normalize_text_field,
             preview_text=self._preview,
         )
+        self._event_extractors = self._build_event_extractors()
 
     async def orchestrate(
         self, request_id: str, task_description: str, metadata: str | None = None
@@ -273,9 +321,16 @@ class PokestratorOrchestrator:
                 subagent.required_provider = inferred_provider
 
         if required_provider:
-            api_key = await get_api_key(required_provider)
+            # The key lookup and the status write share one pooled connection,
+            # which is released before the callback and the Claude run.
+            async with acquire_conn() as conn:
+                api_key = await get_api_key(required_provider, conn=conn)
+                await self._set_subagent_auth_status(
+                    subagent,
+                    status="ready" if api_key else "needs_api_key",
+                    conn=conn,
+                )
             if not api_key:
-                await self._set_subagent_auth_status(subagent, status="needs_api_key")
                 message = self._build_missing_managed_api_key_message(
                     provider=required_provider,
                     subagent_name=subagent.name,
@@ -290,7 +345,6 @@ class PokestratorOrchestrator:
                     },
                 )
 
-            await self._set_subagent_auth_status(subagent, status="ready")
             await self._send_progress_callback(
                 request_id=request_id,
                 task_description=task_description,
@@ -529,7 +583,7 @@ class PokestratorOrchestrator:
                             event_count,
                             ",".join(tool_names),
                         )
-                candidate = self._extract_text(event)
+                candidate, event_result = self._extract_event(event)
                 if candidate:
                     chunks.append(candidate)
                     if self.log_agent_events:
@@ -540,7 +594,6 @@ class PokestratorOrchestrator:
                             event_count,
                             self._preview(candidate),
                         )
-                event_result = self._extract_result(event)
                 if event_result:
                     final_result = event_result
                     logger.info(
@@ -586,14 +639,14 @@ class PokestratorOrchestrator:
 
     def _rank_existing_subagents(
         self, task: str, subagents: list[Subagent]
-    ) -> list[dict[str, Any]]:
+    ) -> list[RankedMatch]:
         return self.router.rank_existing_subagents(task, subagents)
 
-    def _is_confident_ranked_match(self, ranked_matches: list[dict[str, Any]]) -> bool:
+    def _is_confident_ranked_match(self, ranked_matches: list[RankedMatch]) -> bool:
         return self.router.is_confident_ranked_match(ranked_matches)
 
     async def _llm_validate_ranked_match(
-        self, task_description: str, ranked_matches: list[dict[str, Any]]
+        self, task_description: str, ranked_matches: list[RankedMatch]
     ) -> Subagent | None:
         return await self.router.llm_validate_ranked_match(task_description, ranked_matches)
 
@@ -669,7 +722,13 @@ class PokestratorOrchestrator:
             f"Tell the user explicitly that Pokestrator found their {provider} API key from 1Password and is pulling their data now."
         )
 
-    async def _set_subagent_auth_status(self, subagent: Subagent, status: str) -> None:
+    async def _set_subagent_auth_status(
+        self,
+        subagent: Subagent,
+        status: str,
+        *,
+        conn: asyncpg.Connection | None = None,
+    ) -> None:
         if not subagent.id:
             return
         try:
@@ -677,6 +736,7 @@ class PokestratorOrchestrator:
                 subagent.id,
                 status=status,
                 required_provider=subagent.required_provider,
+                conn=conn,
             )
             if updated:
                 subagent.status = updated.status
@@ -810,10 +870,9 @@ class PokestratorOrchestrator:
         chunks: list[str] = []
 
         async for event in stream:
-            candidate = self._extract_text(event)
+            candidate, event_result = self._extract_event(event)
             if candidate:
                 chunks.append(candidate)
-            event_result = self._extract_result(event)
             if event_result:
                 final_result = event_result
 
@@ -837,7 +896,7 @@ class PokestratorOrchestrator:
 
         for candidate in candidates:
             try:
-                parsed = json.loads(candidate)
+                parsed = _loads_json(candidate)
                 if isinstance(parsed, dict):
                     return parsed
             except Exception:
@@ -893,6 +952,33 @@ class PokestratorOrchestrator:
                     names.append(name.strip())
         return names
 
+    def _build_event_extractors(self) -> dict[type, EventExtractors]:
+        # Streamed SDK messages of these exact types never carry text and/or a
+        # result, so the matching extractor is swapped for a no-op and the
+        # per-event work becomes one dict lookup. Other types use both.
+        extractors: dict[type, EventExtractors] = {}
+        if claude_sdk is None:
+            return extractors
+
+        for type_name, pair in (
+            ("SystemMessage", (_no_event_text, _no_event_result)),
+            ("StreamEvent", (_no_event_text, _no_event_result)),
+            ("AssistantMessage", (self._extract_text, _no_event_result)),
+            ("UserMessage", (self._extract_text, _no_event_result)),
+            ("ResultMessage", (self._extract_text, self._extract_result)),
+        ):
+            event_type = getattr(claude_sdk, type_name, None)
+            if isinstance(event_type, type):
+                extractors[event_type] = pair
+        return extractors
+
+    def _extract_event(self, event: Any) -> tuple[str, str | None]:
+        extractors = self._event_extractors.get(type(event))
+        if extractors is None:
+            return self._extract_text(event), self._extract_result(event)
+        extract_text, extract_result = extractors
+        return extract_text(event), extract_result(event)
+
     def _extract_text(self, event: Any) -> str:
         if event is None:
             return ""
@@ -997,7 +1083,7 @@ class PokestratorOrchestrator:
         if not metadata:
             return None
         try:
-            data = json.loads(metadata)
+            data = _loads_json(metadata)
             return data if isinstance(data, dict) else None
         except Exception:
             logger.warning("invalid metadata json provided")
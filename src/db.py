@@ -4,8 +4,10 @@ import asyncio
 import logging
 import os
 import re
-from dataclasses import dataclass
-from typing import Any
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator
 import uuid
 
 import asyncpg
@@ -15,9 +17,99 @@ logger = logging.getLogger("pokestrator.db")
 _POOL: asyncpg.Pool | None = None
 _INITIALIZED = False
 _INIT_LOCK = asyncio.Lock()
-
-
-@dataclass
+_UUID_RE = re.compile(
+    r"\A[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\Z"
+)
+
+# Subagent rows change rarely but are looked up on every routed request, so
+# keep a short-lived in-process copy keyed by id and by lowercased name. Callers
+# mutate the Subagent objects they get back (e.g. required_provider before it is
+# saved), so the cache only ever hands out and stores copies. The TTL is read
+# in init_db, like the other DB settings, so a value from .env is honoured.
+_SUB_TTL = 60.0
+_SUB_BY_ID: dict[str, tuple[float, Subagent]] = {}
+_SUB_BY_NAME: dict[str, tuple[float, Subagent]] = {}
+
+# Columns added after the original subagents schema, applied by init_db only
+# when missing from an existing table.
+_SUBAGENT_COLUMN_MIGRATIONS: dict[str, str] = {
+    "status": "VARCHAR(32) NOT NULL DEFAULT 'ready'",
+    "required_provider": "VARCHAR(128)",
+    "name_key": "TEXT GENERATED ALWAYS AS (LOWER(name)) STORED",
+}
+
+# Hot statements live at module scope so every call sends the identical text,
+# which keeps hitting asyncpg's per-connection prepared-statement cache.
+_SQL_GET_ALL = """
+SELECT id, name, description, system_prompt, status, required_provider
+FROM subagents
+ORDER BY created_at ASC
+"""
+
+_SQL_GET_BY_ID = """
+SELECT id, name, description, system_prompt, status, required_provider
+FROM subagents
+WHERE id = $1
+"""
+
+_SQL_GET_BY_NAME = """
+SELECT id, name, description, system_prompt, status, required_provider
+FROM subagents
+WHERE name_key = $1
+LIMIT 1
+"""
+
+_SQL_INSERT = """
+WITH inserted AS (
+    INSERT INTO subagents (id, name, description, system_prompt, status, required_provider)
+    VALUES ($1, $2, $3, $4, $5, $6)
+    ON CONFLICT (name_key) DO NOTHING
+    RETURNING id, name, description, system_prompt, status, required_provider
+)
+SELECT id, name, description, system_prompt, status, required_provider
+FROM inserted
+UNION ALL
+SELECT id, name, description, system_prompt, status, required_provider
+FROM subagents
+WHERE name_key = $7
+LIMIT 1
+"""
+
+_SQL_UPDATE_AUTH = """
+UPDATE subagents
+SET status = $2,
+    required_provider = $3,
+    updated_at = NOW()
+WHERE id = $1
+RETURNING id, name, description, system_prompt, status, required_provider
+"""
+
+_SQL_GET_API_KEY = """
+SELECT provider, api_key
+FROM api_keys
+WHERE provider = $1
+LIMIT 1
+"""
+
+_SQL_UPSERT_API_KEY = """
+INSERT INTO api_keys (provider, api_key)
+VALUES ($1, $2)
+ON CONFLICT (provider)
+DO UPDATE SET api_key = EXCLUDED.api_key, updated_at = NOW()
+RETURNING provider, api_key
+"""
+
+_SQL_MARK_READY = """
+UPDATE subagents
+SET status = 'ready',
+    updated_at = NOW()
+WHERE LOWER(required_provider) = LOWER($1)
+  AND status <> 'ready'
+RETURNING id
+"""
+
+
+@dataclass(slots=True)
 class Subagent:
     id: str
     name: str
@@ -27,7 +119,7 @@ class Subagent:
     required_provider: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ProviderApiKey:
     provider: str
     api_key: str
@@ -84,6 +176,37 @@ def _to_subagent(row: Any) -> Subagent:
     )
 
 
+def _cache_get(cache: dict[str, tuple[float, Subagent]], key: str) -> Subagent | None:
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    expires_at, subagent = entry
+    if expires_at <= time.monotonic():
+        cache.pop(key, None)
+        return None
+    return replace(subagent)
+
+
+def _cache_put(subagent: Subagent) -> Subagent:
+    if _SUB_TTL > 0:
+        entry = (time.monotonic() + _SUB_TTL, replace(subagent))
+        _SUB_BY_ID[subagent.id] = entry
+        _SUB_BY_NAME[subagent.name.lower()] = entry
+    return subagent
+
+
+def _cache_invalidate(subagent_id: str | None = None, name: str | None = None) -> None:
+    if subagent_id:
+        _SUB_BY_ID.pop(subagent_id, None)
+    if name:
+        _SUB_BY_NAME.pop(name.lower(), None)
+
+
+def _cache_clear() -> None:
+    _SUB_BY_ID.clear()
+    _SUB_BY_NAME.clear()
+
+
 def _to_provider_api_key(row: Any) -> ProviderApiKey:
     return ProviderApiKey(
         provider=row["provider"],
@@ -100,9 +223,23 @@ async def get_pool() -> asyncpg.Pool:
     return _POOL
 
 
+@asynccontextmanager
+async def acquire_conn(
+    conn: asyncpg.Connection | None = None,
+) -> AsyncIterator[asyncpg.Connection]:
+    if conn is not None:
+        yield conn
+        return
+
+    pool = await get_pool()
+    async with pool.acquire() as acquired:
+        yield acquired
+
+
 async def init_db() -> None:
     global _POOL
     global _INITIALIZED
+    global _SUB_TTL
 
     if _INITIALIZED and _POOL is not None:
         return
@@ -111,6 +248,7 @@ async def init_db() -> None:
         if _INITIALIZED and _POOL is not None:
             return
 
+        _SUB_TTL = float(os.getenv("DB_SUBAGENT_CACHE_TTL_SECONDS", "60"))
         database_url = _normalize_database_url(_resolve_database_url())
         min_size = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
         max_size = int(os.getenv("DB_POOL_MAX_SIZE", "5"))
@@ -131,36 +269,47 @@ async def init_db() -> None:
                     system_prompt TEXT NOT NULL,
                     status VARCHAR(32) NOT NULL DEFAULT 'ready',
                     required_provider VARCHAR(128),
+                    name_key TEXT GENERATED ALWAYS AS (LOWER(name)) STORED,
                     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
                     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
                 )
                 """
             )
-            await conn.execute(
+            # Only migrate columns that are actually missing so warm starts skip
+            # the ALTER/UPDATE round trips entirely.
+            column_rows = await conn.fetch(
                 """
-                ALTER TABLE subagents
-                ADD COLUMN IF NOT EXISTS status VARCHAR(32) NOT NULL DEFAULT 'ready'
-                """
-            )
-            await conn.execute(
-                """
-                ALTER TABLE subagents
-                ADD COLUMN IF NOT EXISTS required_provider VARCHAR(128)
-                """
-            )
-            await conn.execute(
-                """
-                UPDATE subagents
-                SET status = 'ready'
-                WHERE status IS NULL
+                SELECT column_name
+                FROM information_schema.columns
+                WHERE table_schema = current_schema()
+                  AND table_name = 'subagents'
                 """
             )
+            existing_columns = {row["column_name"] for row in column_rows}
+            added_columns: set[str] = set()
+            for column, definition in _SUBAGENT_COLUMN_MIGRATIONS.items():
+                if column in existing_columns:
+                    continue
+                await conn.execute(
+                    f"ALTER TABLE subagents ADD COLUMN IF NOT EXISTS {column} {definition}"
+                )
+                added_columns.add(column)
+            if "status" in added_columns:
+                await conn.execute(
+                    """
+                    UPDATE subagents
+                    SET status = 'ready'
+                    WHERE status IS NULL
+                    """
+                )
             await conn.execute(
                 """
-                CREATE UNIQUE INDEX IF NOT EXISTS idx_subagents_lower_name
-                ON subagents (LOWER(name))
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_subagents_name_key
+                ON subagents (name_key)
                 """
             )
+            if "name_key" in added_columns:
+                await conn.execute("DROP INDEX IF EXISTS idx_subagents_lower_name")
             await conn.execute(
                 """
                 CREATE INDEX IF NOT EXISTS idx_subagents_required_provider
@@ -201,53 +350,41 @@ async def close_db() -> None:
     await _POOL.close()
     _POOL = None
     _INITIALIZED = False
+    _cache_clear()
 
 
-async def get_all_subagents() -> list[Subagent]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(
-            """
-            SELECT id, name, description, system_prompt, status, required_provider
-            FROM subagents
-            ORDER BY created_at ASC
-            """
-        )
-        return [_to_subagent(row) for row in rows]
+async def get_all_subagents(*, conn: asyncpg.Connection | None = None) -> list[Subagent]:
+    async with acquire_conn(conn) as conn:
+        rows = await conn.fetch(_SQL_GET_ALL)
+        return list(map(_to_subagent, rows))
 
 
-async def get_subagent_by_id(subagent_id: str) -> Subagent | None:
-    try:
-        uuid.UUID(subagent_id)
-    except (TypeError, ValueError):
+async def get_subagent_by_id(
+    subagent_id: str, *, conn: asyncpg.Connection | None = None
+) -> Subagent | None:
+    if not isinstance(subagent_id, str) or not _UUID_RE.match(subagent_id):
         return None
 
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            """
-            SELECT id, name, description, system_prompt, status, required_provider
-            FROM subagents
-            WHERE id = $1
-            """,
-            subagent_id,
-        )
-        return _to_subagent(row) if row else None
+    cached = _cache_get(_SUB_BY_ID, subagent_id)
+    if cached is not None:
+        return cached
 
+    async with acquire_conn(conn) as conn:
+        row = await conn.fetchrow(_SQL_GET_BY_ID, subagent_id)
+        return _cache_put(_to_subagent(row)) if row else None
 
-async def get_subagent_by_name(name: str) -> Subagent | None:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            """
-            SELECT id, name, description, system_prompt, status, required_provider
-            FROM subagents
-            WHERE LOWER(name) = LOWER($1)
-            LIMIT 1
-            """,
-            name,
-        )
-        return _to_subagent(row) if row else None
+
+async def get_subagent_by_name(
+    name: str, *, conn: asyncpg.Connection | None = None
+) -> Subagent | None:
+    name_key = name.strip().lower()
+    cached = _cache_get(_SUB_BY_NAME, name_key)
+    if cached is not None:
+        return cached
+
+    async with acquire_conn(conn) as conn:
+        row = await conn.fetchrow(_SQL_GET_BY_NAME, name_key)
+        return _cache_put(_to_subagent(row)) if row else None
 
 
 async def insert_subagent(
@@ -257,6 +394,7 @@ async def insert_subagent(
     *,
     status: str = "ready",
     required_provider: str | None = None,
+    conn: asyncpg.Connection | None = None,
 ) -> Subagent:
     if not name or not description or not system_prompt:
         raise ValueError("name, description, and system_prompt are required")
@@ -271,33 +409,27 @@ async def insert_subagent(
         raise ValueError("required_provider cannot be empty")
 
     subagent_id = str(uuid.uuid4())
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        existing = await conn.fetchrow(
-            """
-            SELECT id, name, description, system_prompt, status, required_provider
-            FROM subagents
-            WHERE LOWER(name) = LOWER($1)
-            LIMIT 1
-            """,
-            normalized_name,
-        )
-        if existing:
-            return _to_subagent(existing)
-
+    async with acquire_conn(conn) as conn:
+        # Insert and dedup in one round trip: the CTE either inserts the row or
+        # yields nothing on a name conflict, in which case the existing row is
+        # returned by the second branch.
         row = await conn.fetchrow(
-            """
-            INSERT INTO subagents (id, name, description, system_prompt, status, required_provider)
-            VALUES ($1, $2, $3, $4, $5, $6)
-            RETURNING id, name, description, system_prompt, status, required_provider
-            """,
+            _SQL_INSERT,
             subagent_id,
             normalized_name,
             description.strip(),
             system_prompt.strip(),
             normalized_status,
             normalized_provider,
+            normalized_name.lower(),
         )
+        if row is None:
+            # A concurrent insert of the same name committed after this
+            # statement's snapshot was taken; read it back.
+            row = await conn.fetchrow(_SQL_GET_BY_NAME, normalized_name.lower())
+        if row is None:
+            raise RuntimeError(f"subagent '{normalized_name}' could not be inserted")
+        _cache_invalidate(str(row["id"]), normalized_name)
         return _to_subagent(row)
 
 
@@ -306,10 +438,9 @@ async def update_subagent_auth(
     *,
     status: str,
     required_provider: str | None,
+    conn: asyncpg.Connection | None = None,
 ) -> Subagent | None:
-    try:
-        uuid.UUID(subagent_id)
-    except (TypeError, ValueError):
+    if not isinstance(subagent_id, str) or not _UUID_RE.match(subagent_id):
         return None
 
     normalized_status = _normalize_subagent_status(status)
@@ -317,44 +448,36 @@ async def update_subagent_auth(
     if required_provider and not normalized_provider:
         raise ValueError("required_provider cannot be empty")
 
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with acquire_conn(conn) as conn:
         row = await conn.fetchrow(
-            """
-            UPDATE subagents
-            SET status = $2,
-                required_provider = $3,
-                updated_at = NOW()
-            WHERE id = $1
-            RETURNING id, name, description, system_prompt, status, required_provider
-            """,
+            _SQL_UPDATE_AUTH,
             subagent_id,
             normalized_status,
             normalized_provider,
         )
-        return _to_subagent(row) if row else None
+        _cache_invalidate(subagent_id)
+        if not row:
+            return None
+        updated = _to_subagent(row)
+        _cache_invalidate(name=updated.name)
+        return updated
 
 
-async def get_api_key(provider: str) -> str | None:
+async def get_api_key(
+    provider: str, *, conn: asyncpg.Connection | None = None
+) -> str | None:
     normalized_provider = _normalize_provider(provider)
     if not normalized_provider:
         return None
 
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            """
-            SELECT provider, api_key
-            FROM api_keys
-            WHERE provider = $1
-            LIMIT 1
-            """,
-            normalized_provider,
-        )
+    async with acquire_conn(conn) as conn:
+        row = await conn.fetchrow(_SQL_GET_API_KEY, normalized_provider)
         return row["api_key"] if row else None
 
 
-async def upsert_api_key(provider: str, api_key: str) -> ProviderApiKey:
+async def upsert_api_key(
+    provider: str, api_key: str, *, conn: asyncpg.Connection | None = None
+) -> ProviderApiKey:
     normalized_provider = _normalize_provider(provider)
     if not normalized_provider:
         raise ValueError("provider is required")
@@ -363,38 +486,24 @@ async def upsert_api_key(provider: str, api_key: str) -> ProviderApiKey:
     if not normalized_api_key:
         raise ValueError("api_key is required")
 
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with acquire_conn(conn) as conn:
         row = await conn.fetchrow(
-            """
-            INSERT INTO api_keys (provider, api_key)
-            VALUES ($1, $2)
-            ON CONFLICT (provider)
-            DO UPDATE SET api_key = EXCLUDED.api_key, updated_at = NOW()
-            RETURNING provider, api_key
-            """,
+            _SQL_UPSERT_API_KEY,
             normalized_provider,
             normalized_api_key,
         )
         return _to_provider_api_key(row)
 
 
-async def mark_subagents_ready_for_provider(provider: str) -> int:
+async def mark_subagents_ready_for_provider(
+    provider: str, *, conn: asyncpg.Connection | None = None
+) -> int:
     normalized_provider = _normalize_provider(provider)
     if not normalized_provider:
         return 0
 
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(
-            """
-            UPDATE subagents
-            SET status = 'ready',
-                updated_at = NOW()
-            WHERE LOWER(required_provider) = LOWER($1)
-              AND status <> 'ready'
-            RETURNING id
-            """,
-            normalized_provider,
-        )
+    async with acquire_conn(conn) as conn:
+        rows = await conn.fetch(_SQL_MARK_READY, normalized_provider)
+        if rows:
+            _cache_clear()
         return len(rows)
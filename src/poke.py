@@ -1,11 +1,32 @@
+import json
 import os
+import threading
 from typing import Any, Mapping
 
 import requests
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 load_dotenv()
 
+# Callbacks are posted from asyncio.to_thread workers. requests.Session is not
+# thread-safe, so each worker thread keeps its own session, which still reuses
+# its keep-alive TLS connection to the webhook across posts.
+_SESSIONS = threading.local()
+
+
+def _session() -> requests.Session:
+    session = getattr(_SESSIONS, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers["Content-Type"] = "application/json"
+        _SESSIONS.session = session
+    return session
+
 
 def _bool_env(name: str, default: bool = False) -> bool:
     value = os.getenv(name)
@@ -21,25 +42,24 @@ def _webhook_url() -> str:
     )
 
 
-def send_poke_message(message: str, metadata: Mapping[str, Any] | None = None) -> dict:
+def _build_payload(message: str, metadata: Mapping[str, Any] | None) -> dict:
     payload = {"message": message}
     if metadata:
         payload["metadata"] = dict(metadata)
+    return payload
 
-    if _bool_env("POKE_DRY_RUN", False):
-        return {"ok": True, "dry_run": True, "payload": payload}
 
-    api_key = os.getenv("POKE_API_KEY")
-    if not api_key:
-        raise ValueError("POKE_API_KEY is not set")
+def _encode_payload(payload: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
 
-    response = requests.post(
+def _post_payload(payload: dict, api_key: str) -> dict:
+    response = _session().post(
         _webhook_url(),
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        },
-        json=payload,
+        headers={"Authorization": f"Bearer {api_key}"},
+        data=_encode_payload(payload),
         timeout=15,
     )
     response.raise_for_status()
@@ -50,5 +70,18 @@ def send_poke_message(message: str, metadata: Mapping[str, Any] | None = None) -
     }
 
 
+def send_poke_message(message: str, metadata: Mapping[str, Any] | None = None) -> dict:
+    payload = _build_payload(message, metadata)
+
+    if _bool_env("POKE_DRY_RUN", False):
+        return {"ok": True, "dry_run": True, "payload": payload}
+
+    api_key = os.getenv("POKE_API_KEY")
+    if not api_key:
+        raise ValueError("POKE_API_KEY is not set")
+
+    return _post_payload(payload, api_key)
+
+
 if __name__ == "__main__":
     print(send_poke_message("This is a test message from the Poke API"))
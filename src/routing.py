@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
 import logging
 import re
-from typing import Any, Awaitable, Callable
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, NamedTuple
 
 import claude_agent_sdk as claude_sdk
 
@@ -11,30 +13,140 @@ from db import Subagent
 
 logger = logging.getLogger("pokestrator.routing")
 
-STOP_WORDS = {
-    "a",
-    "an",
-    "and",
-    "are",
-    "as",
-    "at",
-    "for",
-    "from",
-    "how",
-    "i",
-    "in",
-    "is",
-    "it",
-    "my",
-    "of",
-    "on",
-    "the",
-    "to",
-    "with",
-    "me",
-    "you",
-    "your",
-}
+STOP_WORDS = frozenset(
+    {
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "for",
+        "from",
+        "how",
+        "i",
+        "in",
+        "is",
+        "it",
+        "my",
+        "of",
+        "on",
+        "the",
+        "to",
+        "with",
+        "me",
+        "you",
+        "your",
+    }
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokenize(text: str) -> set[str]:
+    # The length check drops every 1-2 character token, not just the short stop
+    # words, so it stays even though it makes those STOP_WORDS entries redundant.
+    return {
+        token
+        for token in _TOKEN_RE.findall(text.lower())
+        if len(token) > 2 and token not in STOP_WORDS
+    }
+
+
+# Subagent names and descriptions are re-ranked on every request but change
+# rarely, so their token sets are memoized by text.
+@lru_cache(maxsize=4096)
+def _cached_tokens(text: str) -> frozenset[str]:
+    return frozenset(_tokenize(text))
+
+
+class RankedMatch(NamedTuple):
+    subagent: Subagent
+    score: int
+    name_hits: tuple[str, ...]
+    description_hits: tuple[str, ...]
+    matched_token_count: int
+    # Lowercased subagent name, so LLM selections are matched without
+    # re-lowering every candidate on each validation.
+    name_key: str
+
+
+# The name/description part of a candidate block only changes when the subagent
+# does, so it is formatted once and reused across validation prompts.
+@lru_cache(maxsize=1024)
+def _candidate_profile(name: str, description: str) -> str:
+    return f"name={name}\n   description={description}\n"
+
+
+def _format_candidates(ranked_matches: list[RankedMatch]) -> str:
+    candidate_blocks: list[str] = []
+    for idx, item in enumerate(ranked_matches, start=1):
+        subagent = item.subagent
+        name_hits = ", ".join(item.name_hits) or "(none)"
+        description_hits = ", ".join(item.description_hits) or "(none)"
+        candidate_blocks.append(
+            (
+                f"{idx}. {_candidate_profile(subagent.name, subagent.description)}"
+                f"   lexical_score={item.score}\n"
+                f"   name_hits={name_hits}\n"
+                f"   description_hits={description_hits}"
+            )
+        )
+    return "\n".join(candidate_blocks)
+
+
+def _build_validation_prompt(task_description: str, ranked_matches: list[RankedMatch]) -> str:
+    return (
+        "Select an existing subagent ONLY if it clearly fits this task. "
+        "If uncertain, choose build_new.\n\n"
+        f"TASK:\n{task_description}\n\n"
+        "CANDIDATES:\n"
+        f"{_format_candidates(ranked_matches)}\n\n"
+        "Return ONLY a JSON object with exactly these keys:\n"
+        '{\n'
+        '  "decision": "match" or "build_new",\n'
+        '  "selected_name": "exact candidate name when decision is match, else empty string",\n'
+        '  "confidence": 0.0,\n'
+        '  "reason": "short explanation"\n'
+        "}\n"
+        "Rules:\n"
+        "- Do not rely only on lexical overlap.\n"
+        "- If capability fit is partial or unclear, choose build_new.\n"
+        "- selected_name must exactly match one candidate name when decision=match.\n"
+    )
+
+
+def _build_batch_validation_prompt(requests: list[tuple[str, list[RankedMatch]]]) -> str:
+    task_blocks = [
+        (
+            f"TASK {idx}:\n{task_description}\n\n"
+            f"CANDIDATES FOR TASK {idx}:\n{_format_candidates(ranked_matches)}"
+        )
+        for idx, (task_description, ranked_matches) in enumerate(requests, start=1)
+    ]
+    return (
+        "For each task below, select an existing subagent ONLY if it clearly fits that task. "
+        "If uncertain, choose build_new.\n\n"
+        + "\n\n".join(task_blocks)
+        + "\n\n"
+        "Return ONLY a JSON object with exactly this shape, one decision per task:\n"
+        '{\n'
+        '  "decisions": [\n'
+        '    {\n'
+        '      "task": 1,\n'
+        '      "decision": "match" or "build_new",\n'
+        '      "selected_name": "exact candidate name when decision is match, else empty string",\n'
+        '      "confidence": 0.0,\n'
+        '      "reason": "short explanation"\n'
+        '    }\n'
+        '  ]\n'
+        "}\n"
+        "Rules:\n"
+        "- Do not rely only on lexical overlap.\n"
+        "- If capability fit is partial or unclear, choose build_new.\n"
+        "- selected_name must exactly match one of that task's candidate names when decision=match.\n"
+    )
+
 
 CollectResponseText = Callable[[Any], Awaitable[str]]
 ParseJsonObject = Callable[[str], dict[str, Any] | None]
@@ -43,6 +155,177 @@ PreviewText = Callable[[str], str]
 BuildSubagentName = Callable[[str], str]
 
 
+# Inverted token index over the subagent catalog last seen by the router. It is
+# rebuilt whenever the ids, names, or descriptions in the catalog change, so
+# callers can keep passing freshly loaded subagent lists. Every vocabulary token
+# gets a bit position, and each subagent's name and description tokens are kept
+# as int bitmasks so scoring is an AND plus int.bit_count().
+class _SubagentIndex:
+    def __init__(self) -> None:
+        self._signature: tuple[tuple[str, str, str], ...] | None = None
+        self._postings: dict[str, list[int]] = {}
+        self._token_bits: dict[str, int] = {}
+        # Per catalog position: (name mask, description mask, their union).
+        self.masks: list[tuple[int, int, int]] = []
+        # Per catalog position: lowercased subagent name.
+        self.name_keys: list[str] = []
+
+    def sync(self, subagents: list[Subagent]) -> None:
+        signature = tuple(
+            (subagent.id, subagent.name, subagent.description) for subagent in subagents
+        )
+        if signature != self._signature:
+            self._rebuild(subagents)
+            self._signature = signature
+
+    def task_mask(self, task_tokens: set[str]) -> int:
+        # Tokens outside the catalog vocabulary cannot match anything.
+        token_bits = self._token_bits
+        mask = 0
+        for token in task_tokens:
+            bit = token_bits.get(token)
+            if bit is not None:
+                mask |= bit
+        return mask
+
+    def candidates(self, task_tokens: set[str]) -> list[int]:
+        positions: set[int] = set()
+        for token in task_tokens:
+            posting = self._postings.get(token)
+            if posting:
+                positions.update(posting)
+        return sorted(positions)
+
+    def _rebuild(self, subagents: list[Subagent]) -> None:
+        postings: dict[str, list[int]] = {}
+        token_bits: dict[str, int] = {}
+        masks: list[tuple[int, int, int]] = []
+        name_keys: list[str] = []
+
+        def mask_of(tokens: frozenset[str]) -> int:
+            mask = 0
+            for token in tokens:
+                bit = token_bits.get(token)
+                if bit is None:
+                    bit = token_bits[token] = 1 << len(token_bits)
+                mask |= bit
+            return mask
+
+        for position, subagent in enumerate(subagents):
+            name_tokens = _cached_tokens(subagent.name)
+            description_tokens = _cached_tokens(subagent.description)
+            name_mask = mask_of(name_tokens)
+            description_mask = mask_of(description_tokens)
+            masks.append((name_mask, description_mask, name_mask | description_mask))
+            name_keys.append(subagent.name.lower())
+            for token in name_tokens | description_tokens:
+                postings.setdefault(token, []).append(position)
+        self._postings = postings
+        self._token_bits = token_bits
+        self.masks = masks
+        self.name_keys = name_keys
+
+
+RunValidationPrompt = Callable[[str], Awaitable[dict[str, Any] | None]]
+
+
+# Coalesces validations that arrive within a short window into one compound
+# prompt and fans the per-task decisions back out to the waiting callers. A
+# batch of one is sent with the regular single-task prompt.
+class ValidationBatcher:
+    def __init__(
+        self,
+        run_prompt: RunValidationPrompt,
+        *,
+        max_size: int,
+        window_seconds: float,
+    ) -> None:
+        self.run_prompt = run_prompt
+        self.max_size = max_size
+        self.window_seconds = window_seconds
+        self._pending: list[tuple[str, list[RankedMatch], asyncio.Future]] = []
+        self._timer: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(
+        self, task_description: str, ranked_matches: list[RankedMatch]
+    ) -> dict[str, Any] | None:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((task_description, ranked_matches, future))
+        if len(self._pending) >= self.max_size:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._spawn(self._dispatch(self._take_pending()))
+        elif self._timer is None:
+            self._timer = self._spawn(self._flush_after_window())
+        return await future
+
+    def _spawn(self, coro: Awaitable[None]) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _take_pending(self) -> list[tuple[str, list[RankedMatch], asyncio.Future]]:
+        batch = self._pending
+        self._pending = []
+        return batch
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.window_seconds)
+        self._timer = None
+        await self._dispatch(self._take_pending())
+
+    async def _dispatch(self, batch: list[tuple[str, list[RankedMatch], asyncio.Future]]) -> None:
+        if not batch:
+            return
+
+        results: list[dict[str, Any] | None] = [None] * len(batch)
+        try:
+            if len(batch) == 1:
+                task_description, ranked_matches, _ = batch[0]
+                results[0] = await self.run_prompt(
+                    _build_validation_prompt(task_description, ranked_matches)
+                )
+            else:
+                logger.info("orchestrator route LLM validation batched tasks=%s", len(batch))
+                parsed = await self.run_prompt(
+                    _build_batch_validation_prompt([(task, matches) for task, matches, _ in batch])
+                )
+                results = self._split_decisions(parsed, len(batch))
+        except Exception:
+            logger.exception("orchestrator route LLM batch validation failed")
+        finally:
+            for (_, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    @staticmethod
+    def _split_decisions(parsed: dict[str, Any] | None, count: int) -> list[dict[str, Any] | None]:
+        decisions = parsed.get("decisions") if parsed else None
+        by_task: dict[int, dict[str, Any]] = {}
+        if isinstance(decisions, list):
+            for position, item in enumerate(decisions, start=1):
+                if not isinstance(item, dict):
+                    continue
+                try:
+                    task_number = int(item.get("task", position))
+                except (TypeError, ValueError):
+                    task_number = position
+                by_task.setdefault(task_number, item)
+
+        results = [by_task.get(task_number) for task_number in range(1, count + 1)]
+        missing = results.count(None)
+        if missing:
+            logger.warning(
+                "orchestrator route LLM batch validation missing decisions=%s of tasks=%s",
+                missing,
+                count,
+            )
+        return results
+
+
 class SubagentRouter:
     def __init__(
         self,
@@ -56,6 +339,9 @@ class SubagentRouter:
         route_llm_top_k: int,
         route_llm_timeout_seconds: int,
         route_llm_min_confidence: float,
+        route_llm_batch_enabled: bool,
+        route_llm_batch_max_size: int,
+        route_llm_batch_window_ms: int,
         collect_response_text: CollectResponseText,
         parse_json_object: ParseJsonObject,
         normalize_text_field: NormalizeTextField,
@@ -70,10 +356,35 @@ class SubagentRouter:
         self.route_llm_top_k = route_llm_top_k
         self.route_llm_timeout_seconds = route_llm_timeout_seconds
         self.route_llm_min_confidence = route_llm_min_confidence
+        self._llm_wait_timeout = min(timeout_seconds, route_llm_timeout_seconds)
         self.collect_response_text = collect_response_text
         self.parse_json_object = parse_json_object
         self.normalize_text_field = normalize_text_field
         self.preview_text = preview_text
+        self._index = _SubagentIndex()
+        # The validator options never change for a router, so build them once.
+        self._llm_options = (
+            claude_sdk.ClaudeAgentOptions(
+                system_prompt=(
+                    "You are a strict routing validator for subagent selection. "
+                    "Output strict JSON only."
+                ),
+                allowed_tools=[],
+                max_turns=1,
+                permission_mode=permission_mode,
+            )
+            if claude_sdk is not None
+            else None
+        )
+        self._batcher = (
+            ValidationBatcher(
+                self._run_validation_prompt,
+                max_size=route_llm_batch_max_size,
+                window_seconds=route_llm_batch_window_ms / 1000,
+            )
+            if route_llm_batch_enabled
+            else None
+        )
 
     async def decide_route(
         self,
@@ -81,23 +392,24 @@ class SubagentRouter:
         subagents: list[Subagent],
         build_new_subagent_name: BuildSubagentName,
     ) -> dict[str, Any]:
-        task = task_description.lower()
-        ranked_matches = self.rank_existing_subagents(task, subagents)
+        log_info = logger.isEnabledFor(logging.INFO)
+        ranked_matches = self.rank_existing_subagents(task_description, subagents)
         if ranked_matches:
             top = ranked_matches[0]
-            top_subagent = top["subagent"]
-            top_score = int(top["score"])
-            second_score = int(ranked_matches[1]["score"]) if len(ranked_matches) > 1 else 0
+            top_subagent = top.subagent
+            top_score = top.score
+            second_score = ranked_matches[1].score if len(ranked_matches) > 1 else 0
             margin = top_score - second_score
 
             if top_score >= self.route_min_score:
                 if self.is_confident_ranked_match(ranked_matches):
-                    logger.info(
-                        "orchestrator route=match strategy=lexical_confident subagent=%s score=%s margin=%s",
-                        top_subagent.name,
-                        top_score,
-                        margin,
-                    )
+                    if log_info:
+                        logger.info(
+                            "orchestrator route=match strategy=lexical_confident subagent=%s score=%s margin=%s",
+                            top_subagent.name,
+                            top_score,
+                            margin,
+                        )
                     return {"branch": "match", "subagent": top_subagent}
 
                 llm_match = await self.llm_validate_ranked_match(
@@ -105,21 +417,23 @@ class SubagentRouter:
                     ranked_matches[: self.route_llm_top_k],
                 )
                 if llm_match:
+                    if log_info:
+                        logger.info(
+                            "orchestrator route=match strategy=llm_validated subagent=%s top_score=%s margin=%s",
+                            llm_match.name,
+                            top_score,
+                            margin,
+                        )
+                    return {"branch": "match", "subagent": llm_match}
+
+                if log_info:
                     logger.info(
-                        "orchestrator route=match strategy=llm_validated subagent=%s top_score=%s margin=%s",
-                        llm_match.name,
+                        "orchestrator route=build_new reason=uncertain_match_rejected top_subagent=%s top_score=%s margin=%s",
+                        top_subagent.name,
                         top_score,
                         margin,
                     )
-                    return {"branch": "match", "subagent": llm_match}
-
-                logger.info(
-                    "orchestrator route=build_new reason=uncertain_match_rejected top_subagent=%s top_score=%s margin=%s",
-                    top_subagent.name,
-                    top_score,
-                    margin,
-                )
-            else:
+            elif log_info:
                 logger.info(
                     "orchestrator route=build_new reason=top_score_below_threshold top_subagent=%s top_score=%s min_score=%s",
                     top_subagent.name,
@@ -128,60 +442,73 @@ class SubagentRouter:
                 )
 
         new_name = build_new_subagent_name(task_description)
-        logger.info("orchestrator route=build_new subagent_name=%s", new_name)
+        if log_info:
+            logger.info("orchestrator route=build_new subagent_name=%s", new_name)
         return {"branch": "build_new", "new_subagent_name": new_name}
 
     def match_existing_subagent(self, task: str, subagents: list[Subagent]) -> Subagent | None:
-        ranked_matches = self.rank_existing_subagents(task, subagents)
+        ranked_matches = self.rank_existing_subagents(task, subagents, limit=1)
         if not ranked_matches:
             return None
 
         top = ranked_matches[0]
-        return top["subagent"] if int(top["score"]) >= self.route_min_score else None
+        return top.subagent if top.score >= self.route_min_score else None
 
     def rank_existing_subagents(
-        self, task: str, subagents: list[Subagent]
-    ) -> list[dict[str, Any]]:
+        self, task: str, subagents: list[Subagent], limit: int | None = None
+    ) -> list[RankedMatch]:
         task_tokens = self.tokenize(task)
         if not task_tokens:
             return []
 
-        ranked: list[dict[str, Any]] = []
-        for subagent in subagents:
-            name_hits = task_tokens.intersection(self.tokenize(subagent.name))
-            description_hits = task_tokens.intersection(self.tokenize(subagent.description))
-            matched_tokens = name_hits.union(description_hits)
-            score = (len(name_hits) * 3) + len(description_hits)
-            if score <= 0:
-                continue
+        index = self._index
+        index.sync(subagents)
+        task_mask = index.task_mask(task_tokens)
+
+        # Score on bitmasks and keep plain tuples; the hit lists are only
+        # materialized for the few matches that survive the top-k cut. The
+        # negated position keeps ties in catalog order, like a stable sort.
+        masks = index.masks
+        scored: list[tuple[int, int, int, int]] = []
+        append = scored.append
+        for position in index.candidates(task_tokens):
+            name_mask, description_mask, union_mask = masks[position]
+            name_count = (task_mask & name_mask).bit_count()
+            score = (name_count * 3) + (task_mask & description_mask).bit_count()
+            if score > 0:
+                append((score, (task_mask & union_mask).bit_count(), name_count, -position))
+
+        # Callers only look at the top match, the runner-up margin, and the
+        # LLM validation shortlist, so avoid sorting the whole candidate list.
+        if limit is None:
+            limit = max(2, self.route_llm_top_k)
+
+        name_keys = index.name_keys
+        ranked: list[RankedMatch] = []
+        for score, matched_token_count, _, negated_position in heapq.nlargest(limit, scored):
+            subagent = subagents[-negated_position]
             ranked.append(
-                {
-                    "subagent": subagent,
-                    "score": score,
-                    "name_hits": sorted(name_hits),
-                    "description_hits": sorted(description_hits),
-                    "matched_token_count": len(matched_tokens),
-                }
+                RankedMatch(
+                    subagent=subagent,
+                    score=score,
+                    name_hits=tuple(sorted(task_tokens.intersection(_cached_tokens(subagent.name)))),
+                    description_hits=tuple(
+                        sorted(task_tokens.intersection(_cached_tokens(subagent.description)))
+                    ),
+                    matched_token_count=matched_token_count,
+                    name_key=name_keys[-negated_position],
+                )
             )
-
-        ranked.sort(
-            key=lambda item: (
-                int(item["score"]),
-                int(item["matched_token_count"]),
-                len(item["name_hits"]),
-            ),
-            reverse=True,
-        )
         return ranked
 
-    def is_confident_ranked_match(self, ranked_matches: list[dict[str, Any]]) -> bool:
+    def is_confident_ranked_match(self, ranked_matches: list[RankedMatch]) -> bool:
         if not ranked_matches:
             return False
 
-        top_score = int(ranked_matches[0]["score"])
-        second_score = int(ranked_matches[1]["score"]) if len(ranked_matches) > 1 else 0
+        top_score = ranked_matches[0].score
+        second_score = ranked_matches[1].score if len(ranked_matches) > 1 else 0
         margin = top_score - second_score
-        matched_token_count = int(ranked_matches[0]["matched_token_count"])
+        matched_token_count = ranked_matches[0].matched_token_count
 
         return (
             top_score >= self.route_confident_score
@@ -190,7 +517,7 @@ class SubagentRouter:
         )
 
     async def llm_validate_ranked_match(
-        self, task_description: str, ranked_matches: list[dict[str, Any]]
+        self, task_description: str, ranked_matches: list[RankedMatch]
     ) -> Subagent | None:
         if not ranked_matches:
             return None
@@ -203,93 +530,51 @@ class SubagentRouter:
             logger.info("orchestrator route LLM validation skipped: claude sdk unavailable")
             return None
 
-        candidate_blocks: list[str] = []
-        by_name: dict[str, Subagent] = {}
-        for idx, item in enumerate(ranked_matches, start=1):
-            subagent = item["subagent"]
-            by_name[subagent.name.lower()] = subagent
-            name_hits = ", ".join(item["name_hits"]) or "(none)"
-            description_hits = ", ".join(item["description_hits"]) or "(none)"
-            candidate_blocks.append(
-                (
-                    f"{idx}. name={subagent.name}\n"
-                    f"   description={subagent.description}\n"
-                    f"   lexical_score={item['score']}\n"
-                    f"   name_hits={name_hits}\n"
-                    f"   description_hits={description_hits}"
-                )
+        if self._batcher is not None:
+            parsed = await self._batcher.submit(task_description, ranked_matches)
+        else:
+            parsed = await self._run_validation_prompt(
+                _build_validation_prompt(task_description, ranked_matches)
             )
-
-        prompt = (
-            "Select an existing subagent ONLY if it clearly fits this task. "
-            "If uncertain, choose build_new.\n\n"
-            f"TASK:\n{task_description}\n\n"
-            "CANDIDATES:\n"
-            f"{chr(10).join(candidate_blocks)}\n\n"
-            "Return ONLY a JSON object with exactly these keys:\n"
-            '{\n'
-            '  "decision": "match" or "build_new",\n'
-            '  "selected_name": "exact candidate name when decision is match, else empty string",\n'
-            '  "confidence": 0.0,\n'
-            '  "reason": "short explanation"\n'
-            "}\n"
-            "Rules:\n"
-            "- Do not rely only on lexical overlap.\n"
-            "- If capability fit is partial or unclear, choose build_new.\n"
-            "- selected_name must exactly match one candidate name when decision=match.\n"
-        )
-
-        options = claude_sdk.ClaudeAgentOptions(
-            system_prompt=(
-                "You are a strict routing validator for subagent selection. "
-                "Output strict JSON only."
-            ),
-            allowed_tools=[],
-            max_turns=1,
-            permission_mode=self.permission_mode,
-        )
-
-        try:
-            stream = claude_sdk.query(prompt=prompt, options=options)
-            if asyncio.iscoroutine(stream):
-                stream = await stream
-            response_text = await asyncio.wait_for(
-                self.collect_response_text(stream),
-                timeout=min(self.timeout_seconds, self.route_llm_timeout_seconds),
-            )
-        except Exception:
-            logger.exception("orchestrator route LLM validation failed")
-            return None
-
-        parsed = self.parse_json_object(response_text)
         if not parsed:
-            logger.warning("orchestrator route LLM validation returned non-JSON output")
             return None
 
         decision = str(parsed.get("decision", "")).strip().lower()
         selected_name = str(parsed.get("selected_name", "")).strip()
         confidence = self.normalize_confidence(parsed.get("confidence"))
-        reason = self.normalize_text_field(parsed.get("reason"), "", 220)
+        # The reason is only ever logged, so skip normalizing it when INFO is off.
+        log_info = logger.isEnabledFor(logging.INFO)
+        reason = self.normalize_text_field(parsed.get("reason"), "", 220) if log_info else ""
 
         if decision != "match":
-            logger.info(
-                "orchestrator route LLM decision=build_new confidence=%.2f reason=%s",
-                confidence,
-                self.preview_text(reason),
-            )
+            if log_info:
+                logger.info(
+                    "orchestrator route LLM decision=build_new confidence=%.2f reason=%s",
+                    confidence,
+                    self.preview_text(reason),
+                )
             return None
 
         if confidence < self.route_llm_min_confidence:
-            logger.info(
-                "orchestrator route LLM rejected match due to low confidence=%.2f threshold=%.2f selected=%s reason=%s",
-                confidence,
-                self.route_llm_min_confidence,
-                selected_name,
-                self.preview_text(reason),
-            )
+            if log_info:
+                logger.info(
+                    "orchestrator route LLM rejected match due to low confidence=%.2f threshold=%.2f selected=%s reason=%s",
+                    confidence,
+                    self.route_llm_min_confidence,
+                    selected_name,
+                    self.preview_text(reason),
+                )
             return None
 
-        selected = by_name.get(selected_name.lower())
+        selected_key = selected_name.lower()
+        selected = next(
+            (
+                item.subagent
+                for item in ranked_matches
+                if item.name_key == selected_key
+            ),
+            None,
+        )
         if selected is None:
             logger.warning(
                 "orchestrator route LLM selected unknown subagent=%s; rejecting",
@@ -297,21 +582,53 @@ class SubagentRouter:
             )
             return None
 
-        logger.info(
-            "orchestrator route LLM accepted subagent=%s confidence=%.2f reason=%s",
-            selected.name,
-            confidence,
-            self.preview_text(reason),
-        )
+        if log_info:
+            logger.info(
+                "orchestrator route LLM accepted subagent=%s confidence=%.2f reason=%s",
+                selected.name,
+                confidence,
+                self.preview_text(reason),
+            )
         return selected
 
-    def normalize_confidence(self, value: Any) -> float:
+    async def _run_validation_prompt(self, prompt: str) -> dict[str, Any] | None:
         try:
-            number = float(value)
+            stream = claude_sdk.query(prompt=prompt, options=self._llm_options)
+            if asyncio.iscoroutine(stream):
+                stream = await stream
+            response_text = await asyncio.wait_for(
+                self.collect_response_text(stream),
+                timeout=self._llm_wait_timeout,
+            )
         except Exception:
+            logger.exception("orchestrator route LLM validation failed")
+            return None
+
+        parsed = self.parse_json_object(response_text)
+        if not parsed:
+            logger.warning("orchestrator route LLM validation returned non-JSON output")
+            return None
+        return parsed
+
+    def normalize_confidence(self, value: Any) -> float:
+        # Parsed JSON only yields numbers or strings here, so anything else is
+        # rejected without going through float() and exception handling.
+        if isinstance(value, (int, float)):
+            number = float(value)
+        elif isinstance(value, str):
+            try:
+                number = float(value)
+            except ValueError:
+                return 0.0
+        else:
+            return 0.0
+        # Written as "not >" so NaN clamps to 0.0 as well.
+        if not number > 0.0:
             return 0.0
-        return min(1.0, max(0.0, number))
+        if number > 1.0:
+            return 1.0
+        return number
 
     def tokenize(self, text: str) -> set[str]:
-        raw_tokens = re.findall(r"[a-z0-9]+", text.lower())
-        return {token for token in raw_tokens if len(token) > 2 and token not in STOP_WORDS}
+        return _tokenize(text)
+
@@ -2,17 +2,33 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import atexit
 import logging
 import os
-import uuid
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 from fastmcp import FastMCP
 
 from agent import PokestratorOrchestrator
 
+# Log records are handed to a background listener thread so stderr and file
+# writes (including rotation) never run on the event loop.
+_log_listener: QueueListener | None = None
+
+
+def _stop_log_listener() -> None:
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+
+atexit.register(_stop_log_listener)
+
+
 def configure_logging() -> None:
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
     log_format = "%(asctime)s %(levelname)s %(name)s %(message)s"
@@ -36,10 +52,23 @@ def configure_logging() -> None:
             )
         )
 
+    formatter = logging.Formatter(log_format)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    global _log_listener
+    _stop_log_listener()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+
+    # The queue handler only merges args into the message; the listener's
+    # handlers apply the real format, so it must not get the basicConfig one.
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
     logging.basicConfig(
         level=log_level,
-        format=log_format,
-        handlers=handlers,
+        handlers=[queue_handler],
         force=True,
     )
 
@@ -50,6 +79,54 @@ logger = logging.getLogger("pokestrator")
 mcp = FastMCP("Pokestrator")
 orchestrator = PokestratorOrchestrator()
 background_tasks: set[asyncio.Task] = set()
+# Caps how many orchestrations run at once; extra requests are still accepted
+# but wait for a slot instead of piling more concurrent work onto the process.
+_inflight = asyncio.Semaphore(max(1, int(os.getenv("POKESTRATOR_MAX_INFLIGHT", "64"))))
+
+# The acknowledgement differs only by request id, which is a generated UUID and
+# never needs JSON escaping, so it is substituted into a prebuilt body.
+_ACCEPTED_TEMPLATE = (
+    '{{"status": "accepted", "request_id": "{}", '
+    '"message": "Task accepted and running asynchronously. '
+    'Result will be posted back to Poke when complete."}}'
+)
+
+# Request ids are sliced from a pooled block of urandom bytes so a burst of
+# orchestrate calls does not pay a getrandom syscall per request.
+_RAND_POOL_SIZE = 4096
+_rand_pool = b""
+_rand_offset = 0
+_rand_lock = threading.Lock()
+
+
+def _reset_rand_pool() -> None:
+    global _rand_pool
+    global _rand_offset
+    _rand_pool = b""
+    _rand_offset = 0
+
+
+# A forked child must not hand out the same ids as its parent. Fork hooks only
+# exist on Unix; Windows has no fork, so there is nothing to reset there.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_rand_pool)
+
+
+def fast_uuid4() -> str:
+    global _rand_pool
+    global _rand_offset
+    with _rand_lock:
+        if _rand_offset + 16 > len(_rand_pool):
+            _rand_pool = os.urandom(_RAND_POOL_SIZE)
+            _rand_offset = 0
+        raw = bytearray(_rand_pool[_rand_offset : _rand_offset + 16])
+        _rand_offset += 16
+
+    # RFC 4122 version 4, variant 1.
+    raw[6] = (raw[6] & 0x0F) | 0x40
+    raw[8] = (raw[8] & 0x3F) | 0x80
+    value = raw.hex()
+    return f"{value[:8]}-{value[8:12]}-{value[12:16]}-{value[16:20]}-{value[20:]}"
 
 
 @mcp.tool(
@@ -66,7 +143,7 @@ background_tasks: set[asyncio.Task] = set()
     )
 )
 async def orchestrate(task_description: str, metadata: str = "") -> str:
-    request_id = str(uuid.uuid4())
+    request_id = fast_uuid4()
     logger.info(
         "accepted orchestrate request_id=%s task_description=%s metadata=%s",
         request_id,
@@ -74,21 +151,16 @@ async def orchestrate(task_description: str, metadata: str = "") -> str:
         metadata,
     )
 
-    task = asyncio.create_task(orchestrator.orchestrate(request_id, task_description, metadata))
+    async def _run() -> None:
+        async with _inflight:
+            await orchestrator.orchestrate(request_id, task_description, metadata)
+
+    task = asyncio.create_task(_run())
 
     background_tasks.add(task)
     task.add_done_callback(lambda done: background_tasks.discard(done))
 
-    return json.dumps(
-        {
-            "status": "accepted",
-            "request_id": request_id,
-            "message": (
-                "Task accepted and running asynchronously. "
-                "Result will be posted back to Poke when complete."
-            ),
-        }
-    )
+    return _ACCEPTED_TEMPLATE.format(request_id)
 
 def main() -> None:
     mcp.run(
@@ -15,14 +15,17 @@ def load_dotenv_if_present(path: str = ".env") -> None:
     if not env_path.exists():
         return
 
-    for raw_line in env_path.read_text(encoding="utf-8").splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith("#") or "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        key = key.strip()
-        value = value.strip().strip('"').strip("'")
-        os.environ.setdefault(key, value)
+    with env_path.open("r", encoding="utf-8") as env_file:
+        for raw_line in env_file:
+            line = raw_line.strip()
+            if not line or line.startswith("#"):
+                continue
+            key, sep, value = line.partition("=")
+            if not sep:
+                continue
+            key = key.strip()
+            value = value.strip().strip('"').strip("'")
+            os.environ.setdefault(key, value)
 
 
 def resolve_database_url() -> str:
@@ -48,6 +51,10 @@ def normalize_database_url(value: str) -> str:
     return value
 
 
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
 async def reset_db() -> None:
     load_dotenv_if_present()
     database_url = normalize_database_url(resolve_database_url())
@@ -66,25 +73,10 @@ async def reset_db() -> None:
             print("No tables found in public schema. Nothing to reset.")
             return
 
-        await conn.execute(
-            """
-            DO $$
-            DECLARE r RECORD;
-            BEGIN
-                FOR r IN
-                    SELECT schemaname, tablename
-                    FROM pg_tables
-                    WHERE schemaname = 'public'
-                LOOP
-                    EXECUTE format(
-                        'TRUNCATE TABLE %I.%I RESTART IDENTITY CASCADE',
-                        r.schemaname,
-                        r.tablename
-                    );
-                END LOOP;
-            END $$;
-            """
+        table_list = ", ".join(
+            f"{quote_identifier('public')}.{quote_identifier(row['tablename'])}" for row in tables
         )
+        await conn.execute(f"TRUNCATE TABLE {table_list} RESTART IDENTITY CASCADE")
 
         table_names = ", ".join(row["tablename"] for row in tables)
         print(f"Reset complete. Truncated tables: {table_names}")
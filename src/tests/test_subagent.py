@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import io
 import logging
 import os
 import sys
@@ -10,6 +11,11 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 SRC_DIR = PROJECT_ROOT / "src"
 if str(SRC_DIR) not in sys.path:
@@ -21,6 +27,13 @@ from db import Subagent, get_subagent_by_name, init_db  # noqa: E402
 
 logger = logging.getLogger("pokestrator.test")
 
+# Reused across repeated run() calls when this module is imported and driven
+# in-process, so only the first call pays orchestrator setup.
+_ORCH: PokestratorOrchestrator | None = None
+
+EVENT_FLUSH_EVERY = 32
+EVENT_FLUSH_INTERVAL_SECONDS = 0.05
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -47,6 +60,12 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Print the selected subagent system prompt before running.",
     )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="Skip the selected subagent/timeout/permission header lines.",
+    )
     parser.add_argument(
         "--log-level",
         default=os.getenv("LOG_LEVEL", "INFO"),
@@ -70,17 +89,19 @@ async def resolve_subagent(
     task_description: str,
     subagent_name: str,
 ) -> tuple[Subagent, str]:
-    try:
-        await init_db()
-    except Exception:
-        logger.exception("DB init failed; continuing with route/template resolution")
-
+    # get_subagent_by_name initializes the pool and schema on first use, so the
+    # explicit branch goes straight to the lookup.
     if subagent_name:
         subagent = await get_subagent_by_name(subagent_name)
         if subagent is None:
             raise RuntimeError(f"subagent '{subagent_name}' was not found in DB")
         return subagent, "explicit"
 
+    try:
+        await init_db()
+    except Exception:
+        logger.exception("DB init failed; continuing with route/template resolution")
+
     decision = await orchestrator._decide_route(task_description)
     branch = decision["branch"]
 
@@ -121,35 +142,75 @@ async def stream_subagent_run(
     if asyncio.iscoroutine(stream):
         stream = await stream
 
+    extract_event = orchestrator._extract_event
+
     async def consume() -> str:
         event_count = 0
         final_result: str | None = None
-        chunks: list[str] = []
-
-        async for event in stream:
-            event_count += 1
-            print(f"\n[event {event_count}] type={type(event).__name__}")
-
-            text = orchestrator._extract_text(event)
-            if text:
-                print(f"text: {text}")
-                chunks.append(text)
-
-            result = orchestrator._extract_result(event)
-            if result:
-                print(f"result: {result}")
-                final_result = result
+        text_buffer = io.StringIO()
+
+        # Event output is collected and written in batches instead of a print
+        # call per line. A timer armed by the first buffered event flushes it
+        # within the interval even if the stream stalls (e.g. a long tool call).
+        pending: list[str] = []
+        loop = asyncio.get_running_loop()
+        flush_timer: asyncio.TimerHandle | None = None
+
+        def flush_output() -> None:
+            nonlocal flush_timer
+            if flush_timer is not None:
+                flush_timer.cancel()
+                flush_timer = None
+            if pending:
+                sys.stdout.write("".join(pending))
+                pending.clear()
+            sys.stdout.flush()
+
+        try:
+            async for event in stream:
+                event_count += 1
+                pending.append(f"\n[event {event_count}] type={type(event).__name__}\n")
+
+                text, result = extract_event(event)
+                if text:
+                    pending.append(f"text: {text}\n")
+                    text_buffer.write(text)
+                    text_buffer.write("\n")
+
+                if result:
+                    pending.append(f"result: {result}\n")
+                    final_result = result
+
+                # The final result event carries token usage; the cache counters show
+                # whether the subagent system prompt was served from the prompt cache.
+                usage = getattr(event, "usage", None)
+                if isinstance(usage, dict) and "cache_read_input_tokens" in usage:
+                    pending.append(
+                        "usage: "
+                        f"input_tokens={usage.get('input_tokens', 0)} "
+                        f"cache_read_input_tokens={usage.get('cache_read_input_tokens', 0)} "
+                        f"cache_creation_input_tokens={usage.get('cache_creation_input_tokens', 0)}\n"
+                    )
+
+                if event_count % EVENT_FLUSH_EVERY == 0:
+                    flush_output()
+                elif flush_timer is None:
+                    flush_timer = loop.call_later(EVENT_FLUSH_INTERVAL_SECONDS, flush_output)
+        finally:
+            flush_output()
 
         if final_result:
             return final_result.strip()
-        if chunks:
-            return "\n".join(chunks).strip()
+        if text_buffer.tell():
+            return text_buffer.getvalue().strip()
         return ""
 
-    return await asyncio.wait_for(consume(), timeout=timeout_seconds)
+    async with asyncio.timeout(timeout_seconds):
+        return await consume()
 
 
-async def run() -> int:
+async def run(orchestrator: PokestratorOrchestrator | None = None) -> int:
+    global _ORCH
     args = parse_args()
 
     logging.basicConfig(
@@ -157,17 +218,27 @@ async def run() -> int:
         format="%(asctime)s %(levelname)s %(name)s %(message)s",
     )
     load_dotenv()
-
-    orchestrator = PokestratorOrchestrator()
+    # Output is flushed explicitly in batches, so drop per-line flushing.
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=False, write_through=False)
+
+    if orchestrator is None:
+        if _ORCH is None:
+            _ORCH = PokestratorOrchestrator()
+        orchestrator = _ORCH
     subagent, source = await resolve_subagent(orchestrator, args.task, args.subagent_name)
 
-    print(f"selected_subagent={subagent.name} source={source}")
-    print(f"timeout_seconds={args.timeout}")
-    print(f"permission_mode={args.permission_mode} tools_preset={args.tools_preset}")
+    if not args.quiet:
+        sys.stdout.write(
+            f"selected_subagent={subagent.name} source={source}\n"
+            f"timeout_seconds={args.timeout}\n"
+            f"permission_mode={args.permission_mode} tools_preset={args.tools_preset}\n"
+        )
     if args.show_prompt:
         print("\n--- system_prompt ---")
         print(subagent.system_prompt)
         print("--- end system_prompt ---\n")
+    sys.stdout.flush()
 
     try:
         result = await stream_subagent_run(
@@ -196,4 +267,4 @@ async def run() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(asyncio.run(run()))
+    raise SystemExit(uvloop.run(run()) if uvloop is not None else asyncio.run(run()))
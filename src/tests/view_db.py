@@ -4,26 +4,52 @@ from __future__ import annotations
 import asyncio
 import json
 import os
+import re
+import sys
 from pathlib import Path
 
 import asyncpg
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 
+_POOL: asyncpg.Pool | None = None
+
+# One KEY=value assignment per line. Values may be double- or single-quoted;
+# a "#" only starts an inline comment after whitespace, so values such as
+# pa#ss or URL fragments stay intact. Comment and blank lines never match, and
+# a trailing \r is tolerated for CRLF files.
+_ENV_RE = re.compile(
+    rb"^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*"
+    rb"(?:\"([^\"\n]*)\"|'([^'\n]*)'|([^\n]*?))"
+    rb"(?:[ \t]+#[^\n]*)?[ \t\r]*$",
+    re.M,
+)
+
 
 def load_dotenv_if_present(path: str = ".env") -> None:
     env_path = PROJECT_ROOT / path
     if not env_path.exists():
         return
 
-    for raw_line in env_path.read_text(encoding="utf-8").splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith("#") or "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        key = key.strip()
-        value = value.strip().strip('"').strip("'")
-        os.environ.setdefault(key, value)
+    for match in _ENV_RE.finditer(env_path.read_bytes()):
+        key, double_quoted, single_quoted, bare = match.groups()
+        if double_quoted is not None:
+            value = double_quoted
+        elif single_quoted is not None:
+            value = single_quoted
+        else:
+            value = bare.rstrip()
+        os.environ.setdefault(key.decode("utf-8"), value.decode("utf-8"))
 
 
 def resolve_database_url() -> str:
@@ -49,36 +75,87 @@ def normalize_database_url(value: str) -> str:
     return value
 
 
-async def view_subagents() -> None:
-    load_dotenv_if_present()
-    database_url = normalize_database_url(resolve_database_url())
-    conn = await asyncpg.connect(database_url)
-    try:
-        rows = await conn.fetch(
-            """
-            SELECT id, name, description, system_prompt, created_at, updated_at
-            FROM subagents
-            ORDER BY created_at ASC
-            """
+def _dump_record(record: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_INDENT_2)
+    return json.dumps(record, indent=2).encode("utf-8")
+
+
+async def get_pool() -> asyncpg.Pool:
+    global _POOL
+    if _POOL is None:
+        load_dotenv_if_present()
+        database_url = normalize_database_url(resolve_database_url())
+        _POOL = await asyncpg.create_pool(
+            database_url,
+            min_size=1,
+            max_size=5,
+            command_timeout=30,
         )
-    finally:
-        await conn.close()
+    return _POOL
 
-    payload = [
-        {
-            "id": str(row["id"]),
-            "name": row["name"],
-            "description": row["description"],
-            "system_prompt": row["system_prompt"],
-            "created_at": row["created_at"].isoformat() if row["created_at"] else None,
-            "updated_at": row["updated_at"].isoformat() if row["updated_at"] else None,
-        }
-        for row in rows
-    ]
 
-    print(f"subagents count: {len(payload)}")
-    print(json.dumps(payload, indent=2))
+async def close_pool() -> None:
+    global _POOL
+    if _POOL is None:
+        return
+    await _POOL.close()
+    _POOL = None
+
+
+async def view_subagents(pool: asyncpg.Pool | None = None) -> None:
+    if pool is None:
+        pool = await get_pool()
+    # The count and the rows come from one repeatable-read snapshot, so the
+    # header always matches the streamed list. Rows are read through a
+    # server-side cursor and written one at a time as bytes, in the same layout
+    # as an indented dump of the whole list. Every column is already text when
+    # it leaves Postgres, so each row is dumped as dict(row).
+    async with pool.acquire() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            count = await conn.fetchval("SELECT count(*) FROM subagents")
+            sys.stdout.flush()
+            write = sys.stdout.buffer.write
+            write(f"subagents count: {count}\n".encode("utf-8"))
+            if not count:
+                write(b"[]\n")
+                return
+
+            write(b"[")
+            separator = b"\n"
+            async for row in conn.cursor(
+                """
+                SELECT
+                    id::text AS id,
+                    name,
+                    description,
+                    system_prompt,
+                    to_char(
+                        created_at AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"'
+                    ) AS created_at,
+                    to_char(
+                        updated_at AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"'
+                    ) AS updated_at
+                FROM subagents
+                ORDER BY subagents.created_at ASC
+                """,
+                prefetch=100,
+            ):
+                write(separator)
+                write(b"  " + _dump_record(dict(row)).replace(b"\n", b"\n  "))
+                separator = b",\n"
+            write(b"\n]\n")
+
+
+async def main() -> None:
+    try:
+        await view_subagents()
+    finally:
+        await close_pool()
 
 
 if __name__ == "__main__":
-    asyncio.run(view_subagents())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())